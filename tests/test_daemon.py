@@ -0,0 +1,108 @@
+import os
+import time
+import threading
+
+from text2rec.daemons.daemon import start_daemon
+from text2rec.daemons.instrumentation import Metrics
+
+
+def run_daemon(watched_dir, callback, **kwargs):
+    thread = threading.Thread(
+        target=start_daemon,
+        args=(str(watched_dir), "csv", callback),
+        kwargs=dict(delay=0.01, **kwargs),
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def create_files(watched_dir, count):
+    for i in range(count):
+        (watched_dir / f"{i}.csv").write_text("film_id\n1\n")
+        # ctime resolution can be coarse, keep files ordered
+        time.sleep(0.02)
+
+
+def test_slow_file_profile_is_saved_into_created_dir(tmp_path):
+    profile_dir = tmp_path / "profiles" / "nested"
+    metrics = Metrics()
+    processed = []
+
+    def callback(path):
+        time.sleep(0.2)
+        processed.append(path)
+
+    run_daemon(
+        tmp_path,
+        callback,
+        metrics=metrics,
+        profile_dir=str(profile_dir),
+        slow_file_seconds=0.1,
+    )
+    create_files(tmp_path, 2)
+    assert wait_for(lambda: len(processed) == 2)
+    assert sorted(os.listdir(profile_dir)) == ["0_0.folded", "1_0.folded"]
+
+
+def test_retry_sleep_is_not_timed(tmp_path):
+    profile_dir = tmp_path / "profiles"
+    metrics_path = tmp_path / "metrics.prom"
+    metrics = Metrics()
+    attempts = []
+
+    def callback(path):
+        attempts.append(path)
+        if len(attempts) == 1:
+            raise RuntimeError("first attempt fails")
+
+    run_daemon(
+        tmp_path,
+        callback,
+        metrics=metrics,
+        retry_delay=0.3,
+        metrics_path=str(metrics_path),
+        profile_dir=str(profile_dir),
+        slow_file_seconds=0.2,
+    )
+    create_files(tmp_path, 1)
+    # The first failed attempt already exports, wait for the successful one
+    assert wait_for(
+        lambda: metrics_path.exists()
+        and "processed_total 1" in metrics_path.read_text()
+    )
+    assert len(attempts) == 2
+    assert os.listdir(profile_dir) == []
+    assert metrics.histograms["file_seconds"][()].sum < 0.2
+    text = metrics_path.read_text()
+    assert "text2rec_files_processed_total 1" in text
+    assert "text2rec_callback_errors_total 1" in text
+
+
+def test_metrics_are_exported_while_file_keeps_failing(tmp_path):
+    metrics_path = tmp_path / "metrics.prom"
+
+    def callback(path):
+        raise RuntimeError("always fails")
+
+    run_daemon(
+        tmp_path,
+        callback,
+        metrics=Metrics(),
+        retry_delay=60,
+        metrics_path=str(metrics_path),
+    )
+    create_files(tmp_path, 1)
+    assert wait_for(metrics_path.exists)
+    text = metrics_path.read_text()
+    assert "text2rec_callback_errors_total 1" in text
+    assert "text2rec_resident_memory_bytes" in text
@@ -0,0 +1,85 @@
+import random
+
+import numpy as np
+import pytest
+
+from text2rec.scripts import dedup_reviews
+from text2rec.scripts.dedup_reviews import (
+    find_near_duplicates,
+    group_representatives,
+    lsh_bands,
+)
+
+WORDS = "фильм кино сюжет актёр финал герой музыка камера сцена зритель".split()
+
+
+def shingles(text, size=5):
+    return {text[i : i + size] for i in range(len(text) - size + 1)}
+
+
+def jaccard(a, b):
+    a, b = shingles(a), shingles(b)
+    return len(a & b) / len(a | b)
+
+
+def make_pairs(n_pairs, edited_share, seed=0):
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(n_pairs):
+        words = [rng.choice(WORDS) + str(rng.randint(0, 999)) for _ in range(40)]
+        edited = [
+            rng.choice(WORDS) + "x" if rng.random() < edited_share else w
+            for w in words
+        ]
+        texts += [" ".join(words), " ".join(edited)]
+    return texts
+
+
+@pytest.mark.parametrize("threshold, edited_share", [(0.5, 0.2), (0.8, 0.04)])
+def test_pairs_above_threshold_are_grouped(threshold, edited_share):
+    texts = make_pairs(100, edited_share=edited_share)
+    groups = find_near_duplicates(texts, threshold=threshold)
+    similar = [
+        i
+        for i in range(0, len(texts), 2)
+        if jaccard(texts[i], texts[i + 1]) >= threshold + 0.05
+    ]
+    assert len(similar) > 50
+    grouped = [i for i in similar if groups[i + 1] == groups[i]]
+    assert len(grouped) >= 0.95 * len(similar)
+
+
+def test_unrelated_texts_stay_apart():
+    texts = make_pairs(50, edited_share=0.0)[::2]
+    groups = find_near_duplicates(texts, threshold=0.8)
+    assert np.array_equal(groups, np.arange(len(texts)))
+
+
+def test_pairs_are_compared_within_whole_bucket(monkeypatch):
+    # All three share the first band, only the last two are similar
+    signatures = np.array(
+        [[1, 1, 9, 9], [1, 1, 2, 2], [1, 1, 2, 3], [1, 1, 2, 2]], dtype=np.uint64
+    )
+    monkeypatch.setattr(
+        dedup_reviews, "minhash_signatures", lambda texts, **kwargs: signatures
+    )
+    groups = find_near_duplicates(
+        ["a", "b", "c", "b"], threshold=0.75, num_perm=4, bands=2
+    )
+    assert groups.tolist() == [0, 1, 1, 1]
+
+
+def test_group_representatives_fan_out():
+    positions, index = group_representatives(np.array([0, 1, 0, 3, 1]))
+    assert positions.tolist() == [0, 1, 3]
+    assert positions[index].tolist() == [0, 1, 0, 3, 1]
+
+
+def test_lower_threshold_uses_more_bands():
+    assert lsh_bands(0.5, 128) > lsh_bands(0.8, 128) > lsh_bands(0.95, 128)
+
+
+@pytest.mark.parametrize("threshold", [0, -0.1, 1.5])
+def test_invalid_threshold_is_rejected(threshold):
+    with pytest.raises(ValueError):
+        find_near_duplicates(["a", "b"], threshold=threshold)
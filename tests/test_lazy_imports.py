@@ -0,0 +1,31 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+from text2rec.benchmarks.import_time import ENTRY_POINTS, measure_import
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def run_from_repo_root(monkeypatch):
+    # measure_import starts fresh interpreters, they must find text2rec
+    monkeypatch.chdir(ROOT)
+
+
+@pytest.mark.parametrize("statement", ENTRY_POINTS)
+def test_light_entry_points_skip_heavy_modules(statement):
+    assert measure_import(statement, repeat=1)["heavy_modules"] == []
+
+
+@pytest.mark.parametrize("name", ["translate_reviews", "get_embeddings"])
+def test_function_wins_over_submodule_of_same_name(name):
+    code = (
+        f"import text2rec.scripts.{name}\n"
+        f"from text2rec.scripts import {name}\n"
+        f"from text2rec import {name} as top_level\n"
+        f"assert callable({name}) and callable(top_level), {name}\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from text2rec.benchmarks.stages import build_tiny_classifier, notebook_predict
+from text2rec.benchmarks.synthetic import EN_WORDS, generate_reviews
+from text2rec.scripts.predict_sentiment import (
+    LABELS,
+    model_labels,
+    predict_sentiment,
+    predict_sentiment_file,
+)
+
+
+@pytest.fixture(scope="module")
+def classifier(tmp_path_factory):
+    return build_tiny_classifier(str(tmp_path_factory.mktemp("model")), EN_WORDS)
+
+
+def test_empty_input_gives_empty_probas(classifier):
+    model, tokenizer = classifier
+    probas = predict_sentiment(model, tokenizer, [])
+    assert probas.shape == (0, len(LABELS))
+
+
+def test_matches_notebook_predictions(classifier):
+    model, tokenizer = classifier
+    texts = generate_reviews(50, lang="en", noise=0.0)["review_text"].to_list()
+    probas = predict_sentiment(model, tokenizer, texts, batch_size=16)
+    expected = notebook_predict(model, tokenizer, texts, 16, max_length=64)
+    assert np.array_equal(probas.argmax(axis=1), expected)
+
+
+def test_chunk_without_reviews_is_skipped(classifier, tmp_path):
+    model, tokenizer = classifier
+    input_filename = str(tmp_path / "reviews.csv")
+    output_filename = str(tmp_path / "predicted.csv")
+    texts = [None, None, "good film", None, "bad film"]
+    pd.DataFrame({"review_text": texts}).to_csv(input_filename, index=False)
+    predict_sentiment_file(
+        model,
+        tokenizer,
+        input_filename,
+        output_filename,
+        "review_text",
+        chunksize=2,
+        show_progress_bar=False,
+    )
+    predicted = pd.read_csv(output_filename)
+    assert predicted["review_text"].to_list() == ["good film", "bad film"]
+    assert set(predicted["sentiment"]) <= set(LABELS)
+
+
+def test_labels_come_from_model_config(tmp_path):
+    labels = ("NEGATIVE", "NEUTRAL", "POSITIVE")
+    model, tokenizer = build_tiny_classifier(str(tmp_path), EN_WORDS, labels=labels)
+    input_filename = str(tmp_path / "reviews.csv")
+    output_filename = str(tmp_path / "predicted.csv")
+    pd.DataFrame({"review_text": ["good film", "bad film"]}).to_csv(
+        input_filename, index=False
+    )
+    predict_sentiment_file(
+        model,
+        tokenizer,
+        input_filename,
+        output_filename,
+        "review_text",
+        show_progress_bar=False,
+    )
+    predicted = pd.read_csv(output_filename)
+    assert [c for c in predicted.columns if c.startswith("proba_")] == [
+        "proba_negative",
+        "proba_neutral",
+        "proba_positive",
+    ]
+    assert set(predicted["sentiment"]) <= set(labels)
+
+
+def test_default_label_names_fall_back_to_notebook_labels(tmp_path):
+    labels = ("LABEL_0", "LABEL_1")
+    model, _ = build_tiny_classifier(str(tmp_path), EN_WORDS, labels=labels)
+    assert model_labels(model) == LABELS
@@ -0,0 +1,115 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from text2rec.benchmarks.stages import build_tiny_classifier
+from text2rec.benchmarks.synthetic import EN_WORDS, generate_reviews
+from text2rec.scripts.training_data import (
+    TYPE2LABEL,
+    LengthGroupedSampler,
+    TokenStore,
+    load_token_store,
+    make_dataloader,
+)
+
+
+@pytest.fixture(scope="module")
+def tokenizer(tmp_path_factory):
+    return build_tiny_classifier(str(tmp_path_factory.mktemp("model")), EN_WORDS)[1]
+
+
+@pytest.fixture
+def reviews_file(tmp_path):
+    reviews = generate_reviews(300, lang="en", noise=0.0)
+    reviews["review_type"] = np.resize(["POSITIVE", "NEGATIVE", "NEUTRAL"], 300)
+    path = str(tmp_path / "reviews.csv")
+    reviews.to_csv(path, index=False)
+    return path
+
+
+@pytest.mark.parametrize("shuffle", [True, False])
+def test_sampler_yields_whole_length_grouped_batches(shuffle):
+    lengths = np.random.default_rng(0).integers(1, 100, size=1030)
+    sampler = LengthGroupedSampler(
+        lengths, batch_size=16, shuffle=shuffle, mega_batch_mult=10
+    )
+    batches = list(sampler)
+    assert len(batches) == len(sampler)
+    assert sorted(i for batch in batches for i in batch) == list(range(1030))
+    assert sum(len(batch) < 16 for batch in batches) <= 2
+    spread = np.mean([np.ptp(lengths[batch]) for batch in batches])
+    assert spread < 0.2 * np.ptp(lengths)
+
+
+def test_dataloader_keeps_sampler_batches(reviews_file, tokenizer, tmp_path):
+    store = load_token_store(
+        reviews_file,
+        tokenizer,
+        "review_text",
+        label_col="review_type",
+        label_map=TYPE2LABEL,
+        cache_dir=str(tmp_path / "cache"),
+    )
+    assert len(store) == 200
+    loader = make_dataloader(store, batch_size=16)
+    sampler = loader.batch_sampler
+    assert isinstance(sampler, LengthGroupedSampler)
+    batches = list(sampler)
+    sampler.set_epoch(0)
+    for batch, indices in zip(loader, batches):
+        assert batch["input_ids"].shape[0] == len(indices)
+        assert batch["input_ids"].shape[1] == store.lengths[indices].max()
+
+
+def test_batch_order_changes_between_epochs(reviews_file, tokenizer, tmp_path):
+    store = load_token_store(
+        reviews_file, tokenizer, "review_text", cache_dir=str(tmp_path / "cache")
+    )
+    loader = make_dataloader(store, batch_size=16)
+    epochs = [[batch["input_ids"].tolist() for batch in loader] for _ in range(2)]
+    assert epochs[0] != epochs[1]
+    loader.batch_sampler.set_epoch(0)
+    assert [batch["input_ids"].tolist() for batch in loader] == epochs[0]
+
+
+def test_cache_is_reused(reviews_file, tokenizer, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    first, second = [
+        load_token_store(reviews_file, tokenizer, "review_text", cache_dir=cache_dir)
+        for _ in range(2)
+    ]
+    assert first.path == second.path
+    assert os.listdir(cache_dir) == [os.path.basename(first.path)]
+
+
+def test_chunk_without_labelled_reviews_is_skipped(tokenizer, tmp_path):
+    chunks = [
+        pd.DataFrame({"text": ["good film"], "type": ["POSITIVE"]}),
+        pd.DataFrame({"text": ["so so", "meh"], "type": ["NEUTRAL", "NEUTRAL"]}),
+        pd.DataFrame({"text": ["bad film"], "type": ["NEGATIVE"]}),
+    ]
+    store = TokenStore.build(
+        str(tmp_path / "store"),
+        iter(chunks),
+        tokenizer,
+        "text",
+        label_col="type",
+        label_map=TYPE2LABEL,
+    )
+    assert len(store) == 2
+    assert [store[i]["labels"] for i in range(2)] == [1, 0]
+
+
+def test_failed_build_leaves_no_tmp_dir(tokenizer, tmp_path):
+    def chunks():
+        yield pd.DataFrame({"text": ["good film"]})
+        raise RuntimeError("broken file")
+
+    with pytest.raises(RuntimeError):
+        TokenStore.build(str(tmp_path / "store"), chunks(), tokenizer, "text")
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,130 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from text2rec.scripts.translation_engine import (
+    REQUEST_SEPARATOR,
+    HttpTranslateBackend,
+    ThrottledError,
+    TokenBucket,
+    TranslationBackend,
+    TranslationEngine,
+    pack_texts,
+)
+
+
+class FakeBackend(TranslationBackend):
+    def __init__(self, throttle_first=0, keep_separator=True):
+        super().__init__()
+        self.throttle_first = throttle_first
+        self.keep_separator = keep_separator
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def translate(self, text, src, dest):
+        with self.lock:
+            self.requests.append(text)
+            if len(self.requests) <= self.throttle_first:
+                raise ThrottledError("429")
+        if not self.keep_separator:
+            text = text.replace(REQUEST_SEPARATOR.strip(), "")
+        return text.upper()
+
+
+def make_engine(backend, **kwargs):
+    kwargs.setdefault("rate", 1000.0)
+    return TranslationEngine(backend, **kwargs)
+
+
+def test_pack_texts_respects_size_limit():
+    texts = ["a" * 10, "b" * 10, "c" * 30, "d" * 5]
+    batches = pack_texts(texts, max_chars=30)
+    assert [i for batch in batches for i in batch] == [0, 1, 2, 3]
+    for batch in batches:
+        joined = REQUEST_SEPARATOR.join(texts[i] for i in batch)
+        assert len(batch) == 1 or len(joined) <= 30
+
+
+def test_packed_results_are_split_back_in_order():
+    backend = FakeBackend()
+    texts = [f"отзыв {i}" for i in range(50)]
+    result = make_engine(backend, max_request_chars=100).translate(texts)
+    assert result == [text.upper() for text in texts]
+    assert len(backend.requests) < len(texts)
+
+
+def test_lost_separator_falls_back_to_single_requests():
+    backend = FakeBackend(keep_separator=False)
+    texts = ["один", "два", "три"]
+    result = make_engine(backend, max_workers=1).translate(texts)
+    assert result == ["ОДИН", "ДВА", "ТРИ"]
+    assert len(backend.requests) == 1 + len(texts)
+
+
+def test_throttling_does_not_use_retry_budget():
+    backend = FakeBackend(throttle_first=10)
+    engine = make_engine(backend, max_workers=1, max_retries=2)
+    engine.limiter.min_rate = 1000.0
+    assert engine.translate(["текст"]) == ["ТЕКСТ"]
+    assert engine.dropped == 0
+
+
+def test_failed_texts_are_counted():
+    class BrokenBackend(TranslationBackend):
+        def translate(self, text, src, dest):
+            raise RuntimeError("boom")
+
+    engine = make_engine(BrokenBackend(), max_retries=2, retry_delay=0)
+    assert engine.translate(["a", "b"]) == [None, None]
+    assert engine.dropped == 2
+
+
+def test_concurrent_throttles_decrease_rate_once():
+    bucket = TokenBucket(rate=8.0)
+    for _ in range(4):
+        bucket.on_throttle()
+    assert bucket.rate == 4.0
+
+
+def test_success_increases_rate_up_to_max():
+    bucket = TokenBucket(rate=1.0, max_rate=1.1, increase_step=0.05)
+    for _ in range(10):
+        bucket.on_success()
+    assert bucket.rate == pytest.approx(1.1)
+
+
+@pytest.fixture
+def stand_in_service():
+    state = {"throttle": 1}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            if state["throttle"] > 0:
+                state["throttle"] -= 1
+                self.send_response(429)
+                self.end_headers()
+                return
+            body = json.dumps({"translatedText": payload["q"].upper()}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/translate"
+    server.shutdown()
+
+
+def test_http_backend_against_stand_in_service(stand_in_service):
+    pytest.importorskip("requests")
+    engine = make_engine(HttpTranslateBackend(stand_in_service), max_workers=2)
+    texts = [f"отзыв {i}" for i in range(20)]
+    assert engine.translate(texts) == [text.upper() for text in texts]
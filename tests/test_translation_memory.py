@@ -0,0 +1,113 @@
+import itertools
+
+import pandas as pd
+import pytest
+
+from text2rec.scripts import translation_memory
+from text2rec.scripts.translate_reviews import translate_reviews
+from text2rec.scripts.translation_engine import TranslationBackend
+from text2rec.scripts.translation_memory import (
+    TranslationMemory,
+    split_sentences_with_separators,
+)
+
+
+class UpperBackend(TranslationBackend):
+    def __init__(self):
+        super().__init__()
+        self.requests = []
+
+    def translate(self, text, src, dest):
+        self.requests.append(text)
+        return text.upper()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Distinct timestamps, so that LRU order doesn't depend on timer resolution
+    ticks = itertools.count(1)
+    monkeypatch.setattr(translation_memory.time, "time", lambda: next(ticks))
+
+
+@pytest.fixture
+def memory(tmp_path, clock):
+    memory = TranslationMemory(str(tmp_path / "memory.db"), max_entries=3)
+    yield memory
+    memory.close()
+
+
+def test_hits_and_misses_are_counted(memory):
+    memory.put_many({"один": "one", "два": "two"})
+    found = memory.get_many(["один", "  один ", "три"])
+    assert found == {"один": "one", "  один ": "one"}
+    assert memory.stats()["hits"] == 1
+    assert memory.stats()["misses"] == 1
+    assert memory.stats()["hit_rate"] == 0.5
+
+
+def test_least_recently_used_entries_are_evicted(memory):
+    memory.put_many({"a": "A", "b": "B", "c": "C"})
+    memory.get_many(["a"])
+    memory.put_many({"d": "D"})
+    assert len(memory) == 3
+    assert memory.get_many(["a", "b", "c", "d"]) == {"a": "A", "c": "C", "d": "D"}
+
+
+def test_memory_persists_between_runs(tmp_path):
+    path = str(tmp_path / "memory.db")
+    memory = TranslationMemory(path)
+    memory.put_many({"фильм": "movie"})
+    memory.close()
+    memory = TranslationMemory(path)
+    assert memory.get_many(["фильм"]) == {"фильм": "movie"}
+    memory.close()
+
+
+def test_split_sentences_keeps_separators():
+    sentences, separators = split_sentences_with_separators("Раз. Два!\n\nТри?")
+    assert sentences == ["Раз.", "Два!", "Три?"]
+    assert separators == [" ", "\n\n"]
+
+
+def test_translate_reviews_uses_memory_and_keeps_paragraphs(tmp_path):
+    reviews = pd.DataFrame({"text": ["Раз. Два!\n\nТри?", "Два! Раз."]})
+    memory = TranslationMemory(str(tmp_path / "memory.db"))
+    backend = UpperBackend()
+    translated = translate_reviews(
+        reviews,
+        "text",
+        backend=backend,
+        memory=memory,
+        sentence_level=True,
+        show_progress_bar=False,
+    )
+    assert translated["text"].to_list() == ["РАЗ. ДВА!\n\nТРИ?", "ДВА! РАЗ."]
+    backend.requests.clear()
+    translate_reviews(
+        reviews,
+        "text",
+        backend=backend,
+        memory=memory,
+        sentence_level=True,
+        show_progress_bar=False,
+    )
+    assert backend.requests == []
+    memory.close()
+
+
+def test_positional_delay_is_a_deprecated_rate():
+    reviews = pd.DataFrame({"text": ["Раз.", "Два."]})
+    with pytest.warns(DeprecationWarning):
+        translated = translate_reviews(
+            reviews, "text", 0.01, False, backend=UpperBackend()
+        )
+    assert translated["text"].to_list() == ["РАЗ.", "ДВА."]
+
+
+def test_dedup_reports_drops_for_all_reviews(capsys):
+    reviews = pd.DataFrame({"text": ["Один отзыв.", "Один отзыв.", None, None]})
+    translated = translate_reviews(
+        reviews, "text", backend=UpperBackend(), dedup_threshold=0.9
+    )
+    assert translated["text"].to_list() == ["ОДИН ОТЗЫВ.", "ОДИН ОТЗЫВ."]
+    assert "Dropped 2 of 4 reviews" in capsys.readouterr().out
@@ -1,2 +1,26 @@
-from .daemons import *
-from .scripts import *
+import importlib
+
+from .scripts import LAZY_NAMES as SCRIPTS_LAZY_NAMES
+
+LAZY_NAMES = {
+    "start_daemon": "text2rec.daemons.daemon",
+    "Metrics": "text2rec.daemons.instrumentation",
+    "SamplingProfiler": "text2rec.daemons.instrumentation",
+}
+LAZY_NAMES.update(
+    {name: f"text2rec.scripts{module}" for name, module in SCRIPTS_LAZY_NAMES.items()}
+)
+
+__all__ = list(LAZY_NAMES)
+
+
+def __getattr__(name: str):
+    if name not in LAZY_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(LAZY_NAMES[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
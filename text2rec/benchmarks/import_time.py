@@ -0,0 +1,81 @@
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+# Dependencies that light entry points must not pull in at import time
+HEAVY_MODULES = [
+    "torch",
+    "transformers",
+    "sentence_transformers",
+    "selenium",
+    "googletrans",
+    "bs4",
+    "nltk",
+    "requests",
+]
+
+ENTRY_POINTS = [
+    "import text2rec",
+    "from text2rec import start_daemon",
+    "from text2rec import filter_reviews_new",
+    "from text2rec import TextPipeline",
+    "from text2rec import translate_reviews",
+    "from text2rec import get_embeddings",
+    "import text2rec.scripts.filter_reviews",
+]
+
+PROBE = """
+import sys, json, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def measure_import(statement: str, repeat=5):
+    timings, modules = [], []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE.format(statement=statement)],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        timings.append(result["elapsed"])
+        modules = result["modules"]
+    top_level = {name.split(".")[0] for name in modules}
+    heavy = [m for m in HEAVY_MODULES if m in top_level]
+    return {
+        "statement": statement,
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "modules_count": len(modules),
+        "heavy_modules": heavy,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-r", "--repeat", nargs="?", default=5, type=int)
+    parser.add_argument("-o", "--output_filename", nargs="?", default=None)
+    parser.add_argument(
+        "--check", action="store_true", help="exit with 1 if heavy modules load"
+    )
+    args = parser.parse_args()
+
+    results = [measure_import(s, repeat=args.repeat) for s in ENTRY_POINTS]
+    for result in results:
+        print(json.dumps(result), flush=True)
+    if args.output_filename is not None:
+        with open(args.output_filename, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.check and any(result["heavy_modules"] for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
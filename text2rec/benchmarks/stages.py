@@ -0,0 +1,274 @@
+import os
+import json
+import time
+import platform
+import argparse
+import statistics
+import subprocess
+import tempfile
+from typing import Callable, Dict, List
+
+from .synthetic import generate_reviews, generate_reviews_html
+
+__all__ = ["run_benchmarks", "BENCHMARKS"]
+
+
+def measure(func: Callable, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_filter_reviews(size: int, repeat: int):
+    from text2rec.scripts.filter_reviews import filter_reviews_new
+
+    reviews = generate_reviews(size)
+    return measure(lambda: filter_reviews_new(reviews, "review_text"), repeat)
+
+
+def bench_text_pipeline(size: int, repeat: int, stemming: bool):
+    from text2rec.scripts.keyword_search import (
+        TextPipeline,
+        Lowercase,
+        RemovePunctualion,
+        SnowballStemmerWrapper,
+    )
+
+    handlers = [Lowercase(), RemovePunctualion("…«»—")]
+    if stemming:
+        handlers.append(SnowballStemmerWrapper())
+    text_pipeline = TextPipeline(handlers)
+    texts = generate_reviews(size, noise=0.0)["review_text"].to_list()
+    return measure(lambda: [text_pipeline(text) for text in texts], repeat)
+
+
+def bench_parse_reviews(size: int, repeat: int):
+    from bs4 import BeautifulSoup
+
+    from text2rec.scripts.get_reviews import parse_reviews
+
+    html = generate_reviews_html(size)
+
+    def run():
+        soup = BeautifulSoup(html, features="html.parser")
+        parse_reviews(soup, 1)
+
+    return measure(run, repeat)
+
+
+def bench_get_oldest_file(size: int, repeat: int):
+    from text2rec.daemons.daemon import get_oldest_file_and_ts
+
+    with tempfile.TemporaryDirectory() as watched_dir:
+        for i in range(size):
+            open(os.path.join(watched_dir, f"{i}_reviews.csv"), "w").close()
+        return measure(lambda: get_oldest_file_and_ts(watched_dir, "csv", 0), repeat)
+
+
+def build_tiny_model(path: str, vocab: List[str], dim=32):
+    """Randomly initialized BERT-like SentenceTransformer, built offline."""
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+    from sentence_transformers import SentenceTransformer, models
+
+    vocab_file = os.path.join(path, "vocab.txt")
+    with open(vocab_file, "w", encoding="utf-8") as f:
+        f.write("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + vocab))
+    BertTokenizerFast(vocab_file).save_pretrained(path)
+    config = BertConfig(
+        vocab_size=len(vocab) + 5,
+        hidden_size=dim,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=dim * 2,
+        max_position_embeddings=512,
+    )
+    BertModel(config).save_pretrained(path)
+    transformer = models.Transformer(path, max_seq_length=256)
+    pooling = models.Pooling(transformer.get_word_embedding_dimension())
+    return SentenceTransformer(modules=[transformer, pooling], device="cpu")
+
+
+def bench_get_embeddings(size: int, repeat: int):
+    from text2rec.benchmarks.synthetic import EN_WORDS
+    from text2rec.scripts.get_embeddings import get_embeddings
+    from text2rec.scripts.keyword_search import TextPipeline
+
+    reviews = generate_reviews(size, lang="en", noise=0.0)
+    with tempfile.TemporaryDirectory() as path:
+        model = build_tiny_model(path, EN_WORDS)
+        return measure(
+            lambda: get_embeddings(
+                model, reviews, "review_text", TextPipeline(), show_progress_bar=False
+            ),
+            repeat,
+        )
+
+
+def build_tiny_classifier(
+    path: str, vocab: List[str], dim=32, labels=("NEGATIVE", "POSITIVE")
+):
+    """Randomly initialized DistilBERT sentiment classifier, built offline."""
+    from transformers import (
+        DistilBertConfig,
+        DistilBertForSequenceClassification,
+        DistilBertTokenizerFast,
+    )
+
+    vocab_file = os.path.join(path, "vocab.txt")
+    with open(vocab_file, "w", encoding="utf-8") as f:
+        f.write("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + vocab))
+    tokenizer = DistilBertTokenizerFast(vocab_file)
+    config = DistilBertConfig(
+        vocab_size=len(vocab) + 5,
+        dim=dim,
+        n_layers=2,
+        n_heads=2,
+        hidden_dim=dim * 2,
+        id2label=dict(enumerate(labels)),
+        label2id={label: i for i, label in enumerate(labels)},
+    )
+    model = DistilBertForSequenceClassification(config)
+    model.eval()
+    return model, tokenizer
+
+
+def notebook_predict(model, tokenizer, texts: List[str], batch_size: int, max_length):
+    """Inference the way the notebook does it, kept as a baseline."""
+    import torch
+
+    encoded = tokenizer(
+        texts, padding="max_length", truncation=True, max_length=max_length
+    )
+    encoded = {k: torch.tensor(v) for k, v in encoded.items()}
+    model.eval()
+    predictions = []
+    for i in range(0, len(texts), batch_size):
+        batch = {k: v[i : i + batch_size] for k, v in encoded.items()}
+        with torch.no_grad():
+            outputs = model(**batch)
+        preds = torch.argmax(outputs.logits, dim=-1)
+        predictions.extend(preds.cpu().numpy())
+    return predictions
+
+
+def bench_predict_sentiment(
+    size: int, repeat: int, notebook: bool, max_length=64, batch_size=16
+):
+    """Both paths use the same batch size, 64 is the notebook's max_length."""
+    from text2rec.benchmarks.synthetic import EN_WORDS
+    from text2rec.scripts.predict_sentiment import predict_sentiment
+
+    texts = generate_reviews(size, lang="en", noise=0.0)["review_text"].to_list()
+    with tempfile.TemporaryDirectory() as path:
+        model, tokenizer = build_tiny_classifier(path, EN_WORDS)
+    if notebook:
+        return measure(
+            lambda: notebook_predict(model, tokenizer, texts, batch_size, max_length),
+            repeat,
+        )
+    return measure(
+        lambda: predict_sentiment(
+            model, tokenizer, texts, batch_size=batch_size, max_length=max_length
+        ),
+        repeat,
+    )
+
+
+BENCHMARKS: Dict[str, Callable] = {
+    "filter_reviews_new": bench_filter_reviews,
+    "text_pipeline": lambda size, repeat: bench_text_pipeline(size, repeat, False),
+    "text_pipeline_stemming": lambda size, repeat: bench_text_pipeline(
+        size, repeat, True
+    ),
+    "parse_reviews": bench_parse_reviews,
+    "get_oldest_file_and_ts": bench_get_oldest_file,
+    "get_embeddings": bench_get_embeddings,
+    "predict_sentiment": lambda size, repeat: bench_predict_sentiment(
+        size, repeat, False
+    ),
+    "predict_sentiment_notebook": lambda size, repeat: bench_predict_sentiment(
+        size, repeat, True
+    ),
+    # Longer inputs, where padding to max_length wastes more compute
+    "predict_sentiment_len256": lambda size, repeat: bench_predict_sentiment(
+        size, repeat, False, max_length=256
+    ),
+    "predict_sentiment_notebook_len256": lambda size, repeat: bench_predict_sentiment(
+        size, repeat, True, max_length=256
+    ),
+}
+
+
+def environment_info():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "git_commit": commit or None,
+    }
+
+
+def run_benchmarks(names: List[str], sizes: List[int], repeat=5):
+    env = environment_info()
+    results = []
+    for name in names:
+        for size in sizes:
+            timings = BENCHMARKS[name](size, repeat)
+            median = statistics.median(timings)
+            results.append(
+                {
+                    "benchmark": name,
+                    "size": size,
+                    "repeat": repeat,
+                    "median_s": median,
+                    "min_s": min(timings),
+                    "max_s": max(timings),
+                    "items_per_s": size / median if median > 0 else None,
+                    "timestamp": time.time(),
+                    **env,
+                }
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-b", "--benchmarks", nargs="*", default=list(BENCHMARKS))
+    parser.add_argument("-s", "--sizes", nargs="*", default=[100, 1000], type=int)
+    parser.add_argument("-r", "--repeat", nargs="?", default=5, type=int)
+    parser.add_argument(
+        "-o", "--output_filename", nargs="?", default=None, help="path to .jsonl file"
+    )
+    args = parser.parse_args()
+
+    # Everything is generated locally, make sure nothing reaches the hub
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results = run_benchmarks(args.benchmarks, args.sizes, repeat=args.repeat)
+    for result in results:
+        print(json.dumps(result), flush=True)
+    if args.output_filename is not None:
+        # Append, so that runs on different commits can be compared over time
+        with open(args.output_filename, "a") as f:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
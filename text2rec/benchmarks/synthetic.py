@@ -0,0 +1,134 @@
+import random
+from typing import List
+
+import pandas as pd
+
+__all__ = ["generate_review_text", "generate_reviews", "generate_reviews_html"]
+
+RU_WORDS = (
+    "фильм кино сюжет актёр актриса режиссёр сценарий финал герой злодей музыка "
+    "камера монтаж диалог сцена эпизод сериал сезон персонаж история зритель "
+    "отличный скучный красивый странный добрый мрачный смешной неожиданный "
+    "понравился разочаровал удивил смотрел посоветую пересмотрю запомнился "
+    "очень совсем немного слишком действительно просто наконец"
+).split()
+
+EN_WORDS = (
+    "movie film plot actor actress director script ending hero villain music "
+    "camera editing dialogue scene episode series season character story "
+    "viewer great boring beautiful strange kind dark funny unexpected liked "
+    "disappointed surprised watched recommend rewatch memorable very quite "
+    "slightly too really just finally"
+).split()
+
+# Noise that filter_reviews_new has to clean up
+NOISE = [
+    "\n",
+    "\r\n",
+    "\t",
+    "https://www.kinopoisk.ru/film/{}/",
+    "<b>{}</b>",
+    "<i><b>{}</b></i>",
+    "<br>",
+    "\u200b",
+    "\u2122",
+    "\u2028",
+    "\u2460",
+    "\u00e9",
+    "\u2026",
+]
+
+REVIEW_CLASSES = ["good", "bad", "neutral"]
+REVIEW_TYPES = ["POSITIVE", "NEGATIVE", "NEUTRAL"]
+
+RU_MONTHS = [
+    "января",
+    "февраля",
+    "марта",
+    "апреля",
+    "мая",
+    "июня",
+    "июля",
+    "августа",
+    "сентября",
+    "октября",
+    "ноября",
+    "декабря",
+]
+
+
+def generate_sentence(rng: random.Random, words: List[str], min_words=4, max_words=16):
+    sentence = " ".join(rng.choices(words, k=rng.randint(min_words, max_words)))
+    return sentence.capitalize() + rng.choice([".", ".", ".", "!", "?", "…"])
+
+
+def generate_review_text(
+    rng: random.Random, lang="ru", min_sentences=2, max_sentences=12, noise=0.1
+):
+    words = RU_WORDS if lang == "ru" else EN_WORDS
+    parts = []
+    for _ in range(rng.randint(min_sentences, max_sentences)):
+        sentence = generate_sentence(rng, words)
+        if rng.random() < noise:
+            sentence += " " + rng.choice(NOISE).format(rng.choice(words))
+        parts.append(sentence)
+        parts.append("\n" if rng.random() < 0.2 else " ")
+    return "\n" + "".join(parts).strip()
+
+
+def generate_reviews(
+    n_reviews: int, lang="ru", seed=0, n_films=100, noise=0.1, duplicates=0.0
+):
+    """Synthetic reviews shaped like get_reviews output.
+
+    ``duplicates`` is the fraction of reviews that are lightly edited copies
+    of earlier ones, like copy-pasted reviews in scraped corpora.
+    """
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(n_reviews):
+        if texts and rng.random() < duplicates:
+            texts.append(rng.choice(texts) + rng.choice(["", "!", " :)"]))
+        else:
+            texts.append(generate_review_text(rng, lang=lang, noise=noise))
+    return pd.DataFrame(
+        {
+            "film_id": [rng.randint(1, n_films) for _ in range(n_reviews)],
+            "review_id": range(n_reviews),
+            "review_type": rng.choices(REVIEW_TYPES, k=n_reviews),
+            "review_text": texts,
+        }
+    )
+
+
+def generate_review_html(rng: random.Random, review_id: int):
+    text = generate_review_text(rng, noise=0.0).replace("\n", "<br>")
+    author_id = rng.randint(1, 10**6)
+    date = (
+        f"{rng.randint(1, 28)} {rng.choice(RU_MONTHS)} {rng.randint(2000, 2023)}"
+        f" | {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}"
+    )
+    return f"""
+<div class="reviewItem userReview" data-id="{review_id}">
+  <div class="response {rng.choice(REVIEW_CLASSES)}" itemprop="reviews">
+    <p class="profile_name"><a href="/user/{author_id}/">user{author_id}</a></p>
+    <span class="date">{date}</span>
+    <p class="sub_title">{generate_sentence(rng, RU_WORDS, 2, 5)}</p>
+    <div class="brand_words">{text}</div>
+    <ul><li id="comment_num_vote_{review_id}">{rng.randint(0, 99)} / \
+{rng.randint(0, 99)}</li></ul>
+  </div>
+</div>"""
+
+
+def generate_reviews_html(n_reviews: int, content_id=1, seed=0):
+    """Synthetic kinopoisk reviews page understood by parse_reviews."""
+    rng = random.Random(seed)
+    reviews = "".join(generate_review_html(rng, 1000 + i) for i in range(n_reviews))
+    return f"""<html><body>
+<div class="breadcrumbs">
+  <a class="breadcrumbs__link" href="/film/{content_id}/">Film {content_id}</a>
+</div>
+<ul><li class="all">Всего: <b>{n_reviews}</b></li></ul>
+{reviews}
+</body></html>"""
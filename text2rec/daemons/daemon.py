@@ -1,9 +1,18 @@
 import os
 import glob
 import time
+import pathlib
 from typing import Callable
 from argparse import ArgumentParser
 
+from .instrumentation import (
+    Metrics,
+    SamplingProfiler,
+    metrics as default_metrics,
+    add_metrics_args,
+    metrics_kwargs,
+)
+
 __all__ = ["start_daemon"]
 
 
@@ -18,6 +27,23 @@ def get_oldest_file_and_ts(watched_dir: str, file_ext: str, current_ts: int):
     return min(files_ts, key=lambda x: x[1])
 
 
+def dump_profile(profiler: SamplingProfiler, path: str):
+    # Instrumentation must never take the daemon down
+    try:
+        profiler.dump(path)
+    except OSError as e:
+        print(f"Cant save profile to {path}: {str(e)}")
+
+
+def export_metrics(metrics: Metrics, metrics_path: str = None):
+    metrics.update_rss()
+    if metrics_path is not None:
+        try:
+            metrics.write_textfile(metrics_path)
+        except OSError as e:
+            print(f"Cant write metrics to {metrics_path}: {str(e)}")
+
+
 def start_daemon(
     watched_dir: str,
     file_ext: str,
@@ -28,7 +54,17 @@ def start_daemon(
     threshold_ts=0,
     retry_count=1000,
     retry_delay=900,
+    metrics: Metrics = None,
+    metrics_path: str = None,
+    metrics_port: int = None,
+    profile_dir: str = None,
+    slow_file_seconds=60,
 ):
+    metrics = metrics if metrics is not None else default_metrics
+    if metrics_port is not None:
+        metrics.start_http_server(metrics_port)
+    if profile_dir is not None:
+        os.makedirs(profile_dir, exist_ok=True)
     while True:
         try:
             oldest_file, oldest_ts = get_oldest_file_and_ts(
@@ -37,15 +73,36 @@ def start_daemon(
         except ValueError:
             time.sleep(delay)
             continue
+        metrics.observe("queue_lag_seconds", max(time.time() - oldest_ts, 0))
         for i in range(retry_count):
+            profiler = None
+            if profile_dir is not None:
+                profiler = SamplingProfiler()
+                profiler.start()
+            start = time.perf_counter()
+            error = None
             try:
                 callback(oldest_file, *args, **kwargs)
-                break
             except Exception as e:
-                print(f"Got exception in callback: {str(e)}")
-                time.sleep(retry_delay)
+                error = e
+            elapsed = time.perf_counter() - start
+            if profiler is not None:
+                profiler.stop()
+                if elapsed >= slow_file_seconds:
+                    stem = pathlib.Path(oldest_file).stem
+                    dump_profile(profiler, f"{profile_dir}/{stem}_{i}.folded")
+            if error is None:
+                break
+            metrics.inc("callback_errors_total")
+            # Export failures too, a file can keep failing for hours
+            export_metrics(metrics, metrics_path)
+            print(f"Got exception in callback: {str(error)}")
+            time.sleep(retry_delay)
         if i + 1 == retry_count:
             raise MaxRetryException()
+        metrics.inc("files_processed_total")
+        metrics.observe("file_seconds", elapsed)
+        export_metrics(metrics, metrics_path)
         threshold_ts = oldest_ts
 
 
@@ -53,6 +110,7 @@ def main():
     parser = ArgumentParser()
     parser.add_argument("watched_dir")
     parser.add_argument("-e", "--file_ext", required=True)
+    add_metrics_args(parser)
     args = parser.parse_args()
 
     def log(filename):
@@ -61,7 +119,7 @@ def main():
     watched_dir = args.watched_dir
     file_ext = args.file_ext
 
-    start_daemon(watched_dir, file_ext, log)
+    start_daemon(watched_dir, file_ext, log, **metrics_kwargs(args))
 
 
 if __name__ == "__main__":
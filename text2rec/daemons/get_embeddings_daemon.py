@@ -8,6 +8,12 @@ import pandas as pd
 from sentence_transformers import SentenceTransformer
 
 from text2rec import TextPipeline, start_daemon, get_embeddings
+from text2rec.daemons.instrumentation import (
+    Metrics,
+    metrics as default_metrics,
+    add_metrics_args,
+    metrics_kwargs,
+)
 
 
 def callback(
@@ -17,22 +23,30 @@ def callback(
     savepath: str,
     text_pipeline: TextPipeline,
     batch_size: int,
+    dedup_threshold: float = None,
+    metrics: Metrics = default_metrics,
 ):
     print(f"Getting embeddings from {oldest_file_path}", flush=True)
-    reviews = pd.read_csv(oldest_file_path, usecols=["film_id", column_name])
+    with metrics.timer("read"):
+        reviews = pd.read_csv(oldest_file_path, usecols=["film_id", column_name])
+    rows_in = len(reviews)
     reviews.dropna(subset=[column_name], inplace=True)
-    embs = get_embeddings(
-        model,
-        reviews,
-        column_name,
-        text_pipeline,
-        batch_size=batch_size,
-        show_progress_bar=False,
-    )
+    with metrics.timer("encode"):
+        embs = get_embeddings(
+            model,
+            reviews,
+            column_name,
+            text_pipeline,
+            batch_size=batch_size,
+            show_progress_bar=False,
+            dedup_threshold=dedup_threshold,
+        )
+    metrics.rows("encode", rows_in, len(embs))
     film_ids = reviews["film_id"]
     filename = pathlib.Path(oldest_file_path).stem
-    np.save(f"{savepath}/{filename}_embs_en.npy", embs)
-    np.save(f"{savepath}/{filename}_film_ids.npy", film_ids)
+    with metrics.timer("write"):
+        np.save(f"{savepath}/{filename}_embs_en.npy", embs)
+        np.save(f"{savepath}/{filename}_film_ids.npy", film_ids)
     print(f"Saving embeddings to {savepath}/{filename}_embs_en.npy", flush=True)
     print(f"Saving film_ids to {savepath}/{filename}_film_ids.npy", flush=True)
 
@@ -45,6 +59,8 @@ def main():
     parser.add_argument("-c", "--column_name", nargs="?", default="description")
     parser.add_argument("-t", "--threshold_ts", default=time.time(), type=float)
     parser.add_argument("-sp", "--save_path", nargs="?")
+    parser.add_argument("--dedup_threshold", nargs="?", default=None, type=float)
+    add_metrics_args(parser)
     args = parser.parse_args()
 
     device = args.device
@@ -61,13 +77,17 @@ def main():
     model = SentenceTransformer(
         "sentence-transformers/all-mpnet-base-v2", device=device
     )
+    metrics = Metrics()
 
     start_daemon(
         watched_dir,
         "csv",
         callback,
         args=(model, column_name, savepath, text_pipeline, batch_size),
+        kwargs=dict(dedup_threshold=args.dedup_threshold, metrics=metrics),
         threshold_ts=threshold_ts,
+        metrics=metrics,
+        **metrics_kwargs(args),
     )
 
 
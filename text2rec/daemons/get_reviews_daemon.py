@@ -8,6 +8,12 @@ from selenium.webdriver import ChromeOptions
 from selenium.webdriver.remote.webdriver import WebDriver
 
 from text2rec import start_daemon, get_reviews_from_content_list
+from text2rec.daemons.instrumentation import (
+    Metrics,
+    metrics as default_metrics,
+    add_metrics_args,
+    metrics_kwargs,
+)
 
 
 def callback(
@@ -18,6 +24,7 @@ def callback(
     interval: int,
     show_progress=False,
     skipped_first_chunks=0,
+    metrics: Metrics = default_metrics,
 ):
     filename = pathlib.Path(oldest_file_path).stem
     with pd.read_csv(
@@ -35,13 +42,17 @@ def callback(
                 flush=True,
             )
             path = f"{savepath}/{filename}_{start_index}" f"-{end_index}_reviews.csv"
-            result: pd.DataFrame = get_reviews_from_content_list(
-                driver, content_ids, show_progress=show_progress
-            )
+            with metrics.timer("scrape"):
+                result: pd.DataFrame = get_reviews_from_content_list(
+                    driver, content_ids, show_progress=show_progress
+                )
             if result is None:
+                metrics.rows("scrape", len(content_ids), 0)
                 continue
+            metrics.rows("scrape", len(content_ids), len(result))
             print(f"Saving reviews from {oldest_file_path} to {path}", flush=True)
-            result.to_csv(path, index=False)
+            with metrics.timer("write"):
+                result.to_csv(path, index=False)
 
 
 def main():
@@ -51,6 +62,7 @@ def main():
     parser.add_argument("-sp", "--save_path", nargs="?")
     parser.add_argument("--interval", nargs="?", default=1000)
     parser.add_argument("--skipped_first_chunks", nargs="?", default=0, type=int)
+    add_metrics_args(parser)
     args = parser.parse_args()
 
     watched_dir = args.watched_dir
@@ -62,14 +74,21 @@ def main():
     chrome_options = ChromeOptions()
     chrome_options.debugger_address = "localhost:9222"
     chrome_driver = webdriver.Chrome(options=chrome_options)
+    metrics = Metrics()
 
     start_daemon(
         watched_dir,
         "csv",
         callback,
         args=(chrome_driver, id_column_name, savepath, interval),
-        kwargs=dict(show_progress=False, skipped_first_chunks=skipped_first_chunks),
+        kwargs=dict(
+            show_progress=False,
+            skipped_first_chunks=skipped_first_chunks,
+            metrics=metrics,
+        ),
         threshold_ts=time.time(),
+        metrics=metrics,
+        **metrics_kwargs(args),
     )
 
 
@@ -0,0 +1,210 @@
+import os
+import sys
+import time
+import threading
+import traceback
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+__all__ = ["Metrics", "metrics", "SamplingProfiler"]
+
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900)
+
+
+def format_labels(labels: Tuple[Tuple[str, str], ...], **extra):
+    items = list(labels) + list(extra.items())
+    if not items:
+        return ""
+    inner = ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"'))
+        for k, v in items
+    )
+    return "{" + inner + "}"
+
+
+def current_rss():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+
+        # ru_maxrss is the peak, in kilobytes on Linux and bytes on macOS
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """Thread-safe registry of counters, gauges and histograms.
+
+    Metrics are exported in the Prometheus text format, either to a file
+    for node_exporter's textfile collector or over a local HTTP endpoint.
+    """
+
+    def __init__(self, prefix="text2rec_"):
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.counters: Dict[str, Dict[tuple, float]] = defaultdict(dict)
+        self.gauges: Dict[str, Dict[tuple, float]] = defaultdict(dict)
+        self.histograms: Dict[str, Dict[tuple, Histogram]] = defaultdict(dict)
+        self.server = None
+
+    def inc(self, name: str, value=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.counters[name][key] = self.counters[name].get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.gauges[name][key] = value
+
+    def observe(self, name: str, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            if key not in self.histograms[name]:
+                self.histograms[name][key] = Histogram()
+            self.histograms[name][key].observe(value)
+
+    @contextmanager
+    def timer(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("stage_seconds", time.perf_counter() - start, stage=stage)
+
+    def rows(self, stage: str, rows_in: int, rows_out: int):
+        self.inc("rows_in_total", rows_in, stage=stage)
+        self.inc("rows_out_total", rows_out, stage=stage)
+
+    def update_rss(self):
+        self.set("resident_memory_bytes", current_rss())
+
+    def to_prometheus(self):
+        lines = []
+        with self.lock:
+            for kind, series in (("counter", self.counters), ("gauge", self.gauges)):
+                for name, values in sorted(series.items()):
+                    lines.append(f"# TYPE {self.prefix}{name} {kind}")
+                    for labels, value in values.items():
+                        label_str = format_labels(labels)
+                        lines.append(f"{self.prefix}{name}{label_str} {value}")
+            for name, values in sorted(self.histograms.items()):
+                full_name = f"{self.prefix}{name}"
+                lines.append(f"# TYPE {full_name} histogram")
+                for labels, hist in values.items():
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        le = format_labels(labels, le=bound)
+                        lines.append(f"{full_name}_bucket{le} {count}")
+                    le = format_labels(labels, le="+Inf")
+                    lines.append(f"{full_name}_bucket{le} {hist.count}")
+                    label_str = format_labels(labels)
+                    lines.append(f"{full_name}_sum{label_str} {hist.sum}")
+                    lines.append(f"{full_name}_count{label_str} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str):
+        # Write and rename, so that scrapers never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    def start_http_server(self, port: int, addr="127.0.0.1"):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((addr, port), Handler)
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        return self.server
+
+
+class SamplingProfiler:
+    """Samples the stack of one thread and collects folded stacks.
+
+    The output of ``dump`` can be rendered with flamegraph.pl or speedscope.
+    """
+
+    def __init__(self, interval=0.005, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.stacks: Counter = Counter()
+        self.stopped = threading.Event()
+        self.sampler = None
+
+    def _sample(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame)
+            folded = ";".join(f"{f.name} ({f.filename}:{f.lineno})" for f in stack)
+            self.stacks[folded] += 1
+
+    def start(self):
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self.stacks.clear()
+        self.stopped.clear()
+        self.sampler = threading.Thread(target=self._sample, daemon=True)
+        self.sampler.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.sampler is not None:
+            self.sampler.join()
+
+    def dump(self, path: str):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+metrics = Metrics()
+
+
+def add_metrics_args(parser):
+    parser.add_argument("--metrics_path", nargs="?", default=None)
+    parser.add_argument("--metrics_port", nargs="?", default=None, type=int)
+    parser.add_argument("--profile_dir", nargs="?", default=None)
+    parser.add_argument("--slow_file_seconds", nargs="?", default=60, type=float)
+
+
+def metrics_kwargs(args):
+    return dict(
+        metrics_path=args.metrics_path,
+        metrics_port=args.metrics_port,
+        profile_dir=args.profile_dir,
+        slow_file_seconds=args.slow_file_seconds,
+    )
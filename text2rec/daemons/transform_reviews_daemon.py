@@ -4,18 +4,55 @@ import argparse
 
 import pandas as pd
 
-from text2rec import start_daemon, filter_reviews, translate_reviews
+from text2rec import (
+    start_daemon,
+    filter_reviews_new,
+    translate_reviews,
+    TranslationMemory,
+)
+from text2rec.daemons.instrumentation import (
+    Metrics,
+    metrics as default_metrics,
+    add_metrics_args,
+    metrics_kwargs,
+)
 
 
-def callback(oldest_file_path: str, column_name: str, savepath: str):
+def callback(
+    oldest_file_path: str,
+    column_name: str,
+    savepath: str,
+    memory: TranslationMemory = None,
+    sentence_level=False,
+    dedup_threshold: float = None,
+    metrics: Metrics = default_metrics,
+):
     print(f"Transforming reviews from {oldest_file_path}", flush=True)
-    df = pd.read_csv(oldest_file_path)
+    with metrics.timer("read"):
+        df = pd.read_csv(oldest_file_path)
     filename = pathlib.Path(oldest_file_path).stem
-    transformed = filter_reviews(df, column_name)
+    with metrics.timer("transform"):
+        transformed = filter_reviews_new(df, column_name)
+    metrics.rows("transform", len(df), len(transformed))
     path = f"{savepath}/{filename}_transformed.csv"
-    transformed = translate_reviews(transformed, column_name, show_progress_bar=False)
+    rows_in = len(transformed)
+    with metrics.timer("translate"):
+        transformed = translate_reviews(
+            transformed,
+            column_name,
+            memory=memory,
+            sentence_level=sentence_level,
+            dedup_threshold=dedup_threshold,
+            show_progress_bar=False,
+        )
+    metrics.rows("translate", rows_in, len(transformed))
+    if memory is not None:
+        print(f"Translation memory stats: {memory.stats()}", flush=True)
+        for name, value in memory.stats().items():
+            metrics.set(f"translation_memory_{name}", value)
     print(f"Saving transformed reviews to {path}", flush=True)
-    transformed.to_csv(path, index=False)
+    with metrics.timer("write"):
+        transformed.to_csv(path, index=False)
 
 
 def main():
@@ -24,19 +61,36 @@ def main():
     parser.add_argument("-c", "--column_name", nargs="?", default="description")
     parser.add_argument("-t", "--threshold_ts", default=time.time(), type=float)
     parser.add_argument("-sp", "--save_path", nargs="?")
+    parser.add_argument("-m", "--memory_path", nargs="?", default=None)
+    parser.add_argument("--memory_max_entries", nargs="?", default=None, type=int)
+    parser.add_argument("--sentence_level", action="store_true")
+    parser.add_argument("--dedup_threshold", nargs="?", default=None, type=float)
+    add_metrics_args(parser)
     args = parser.parse_args()
 
     watched_dir = args.watched_dir
     column_name = args.column_name
     savepath = args.save_path
     threshold_ts = args.threshold_ts
+    memory = None
+    if args.memory_path is not None:
+        memory = TranslationMemory(args.memory_path, args.memory_max_entries)
+    metrics = Metrics()
 
     start_daemon(
         watched_dir,
         "csv",
         callback,
         args=(column_name, savepath),
+        kwargs=dict(
+            memory=memory,
+            sentence_level=args.sentence_level,
+            dedup_threshold=args.dedup_threshold,
+            metrics=metrics,
+        ),
         threshold_ts=threshold_ts,
+        metrics=metrics,
+        **metrics_kwargs(args),
     )
 
 
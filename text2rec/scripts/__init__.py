@@ -1,6 +1,60 @@
-from .get_images import *
-from .get_reviews import *
-from .filter_reviews import *
-from .get_embeddings import *
-from .keyword_search import *
-from .translate_reviews import *
+import sys
+import types
+import importlib
+
+# Public name -> defining submodule. Submodules are imported on first
+# attribute access so heavy dependencies are only loaded when needed.
+LAZY_NAMES = {
+    "get_imgs": ".get_images",
+    "get_reviews_from_content_list": ".get_reviews",
+    "filter_reviews_new": ".filter_reviews",
+    "get_embeddings": ".get_embeddings",
+    "TextPipeline": ".keyword_search",
+    "translate_reviews": ".translate_reviews",
+    "GoogleTranslateBackend": ".translate_reviews",
+    "TranslationEngine": ".translation_engine",
+    "TranslationBackend": ".translation_engine",
+    "HttpTranslateBackend": ".translation_engine",
+    "ThrottledError": ".translation_engine",
+    "TranslationMemory": ".translation_memory",
+    "split_sentences": ".translation_memory",
+    "find_near_duplicates": ".dedup_reviews",
+    "group_representatives": ".dedup_reviews",
+    "minhash_signatures": ".dedup_reviews",
+    "predict_sentiment": ".predict_sentiment",
+    "predict_sentiment_file": ".predict_sentiment",
+    "TokenStore": ".training_data",
+    "DynamicPaddingCollator": ".training_data",
+    "LengthGroupedSampler": ".training_data",
+    "load_token_store": ".training_data",
+    "make_dataloader": ".training_data",
+}
+
+__all__ = list(LAZY_NAMES)
+
+
+def __getattr__(name: str):
+    if name not in LAZY_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(LAZY_NAMES[name], __name__)
+    value = getattr(module, name)
+    # Cache it, this also shadows submodules named like their function
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+class ScriptsPackage(types.ModuleType):
+    def __setattr__(self, name: str, value):
+        # Importing a submodule binds it onto the package, which would hide
+        # the function of the same name, e.g. translate_reviews. Keep the
+        # function, as the star-imports used to do.
+        if isinstance(value, types.ModuleType) and LAZY_NAMES.get(name) == f".{name}":
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = ScriptsPackage
@@ -0,0 +1,133 @@
+import zlib
+from typing import List, Optional
+
+import numpy as np
+
+__all__ = ["find_near_duplicates", "group_representatives", "minhash_signatures"]
+
+MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def shingle_hashes(text: str, shingle_size: int):
+    text = " ".join(str(text).lower().split())
+    if len(text) <= shingle_size:
+        shingles = {text}
+    else:
+        shingles = {
+            text[i : i + shingle_size] for i in range(len(text) - shingle_size + 1)
+        }
+    hashes = np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for s in shingles),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+    return hashes % MERSENNE_PRIME
+
+
+def minhash_signatures(texts: List[str], num_perm=128, shingle_size=5, seed=0):
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+    b = rng.integers(0, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+    signatures = np.full((len(texts), num_perm), MAX_HASH, dtype=np.uint64)
+    for i, text in enumerate(texts):
+        hashes = shingle_hashes(text, shingle_size)
+        # Operands are below 2**31, so a * x + b can't overflow uint64
+        permuted = (np.outer(hashes, a) + b) % MERSENNE_PRIME
+        signatures[i] = permuted.min(axis=0)
+    return signatures
+
+
+class UnionFind:
+    def __init__(self, size: int):
+        self.parent = np.arange(size)
+
+    def find(self, i: int):
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[i] != root:
+            self.parent[i], i = root, self.parent[i]
+        return root
+
+    def union(self, i: int, j: int):
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            # Smallest position becomes the root, i.e. the group representative
+            self.parent[max(ri, rj)] = min(ri, rj)
+
+
+def lsh_bands(threshold: float, num_perm: int, recall=0.95):
+    """Choose the number of bands so pairs at ``threshold`` become candidates.
+
+    Picks the most rows per band (fewest false candidates) for which a pair
+    with Jaccard similarity ``threshold`` collides in at least one band with
+    probability ``recall``.
+    """
+    for rows in range(num_perm, 0, -1):
+        bands = num_perm // rows
+        if 1 - (1 - threshold**rows) ** bands >= recall:
+            return bands
+    return num_perm
+
+
+def find_near_duplicates(
+    texts: List[str],
+    threshold=0.8,
+    num_perm=128,
+    bands: Optional[int] = None,
+    shingle_size=5,
+):
+    """Group near-duplicate texts with banded MinHash LSH.
+
+    Returns an array where the i-th value is the position of the first
+    text of the i-th text's group, so unique positions are representatives.
+    By default the band layout is derived from ``threshold``.
+
+    Every pair of distinct signatures sharing a bucket is compared, which is
+    quadratic in the bucket size. Texts with identical signatures are merged
+    up front, so many exact copies of one review stay cheap.
+    """
+    if not 0 < threshold <= 1:
+        raise ValueError(f"threshold must be in (0, 1], got {threshold}")
+    if bands is None:
+        bands = lsh_bands(threshold, num_perm)
+    rows = num_perm // bands
+    signatures = minhash_signatures(
+        texts, num_perm=rows * bands, shingle_size=shingle_size
+    )
+    groups = UnionFind(len(texts))
+    keys = signatures.view(np.dtype((np.void, signatures.itemsize * rows * bands)))
+    _, distinct, inverse = np.unique(
+        keys.ravel(), return_index=True, return_inverse=True
+    )
+    for i, j in enumerate(distinct[inverse.ravel()]):
+        groups.union(i, j)
+    signatures = signatures[distinct]
+    for band in range(bands):
+        band_sig = signatures[:, band * rows : (band + 1) * rows].copy()
+        band_keys = band_sig.view(np.dtype((np.void, band_sig.itemsize * rows)))
+        _, buckets = np.unique(band_keys.ravel(), return_inverse=True)
+        order = np.argsort(buckets, kind="stable")
+        bounds = np.flatnonzero(np.diff(buckets[order])) + 1
+        for members in np.split(order, bounds):
+            if len(members) < 2:
+                continue
+            for k, member in enumerate(members[:-1]):
+                others = members[k + 1 :]
+                # Drop LSH false positives by estimated Jaccard similarity
+                similarity = (signatures[others] == signatures[member]).mean(axis=1)
+                for other in others[similarity >= threshold]:
+                    groups.union(distinct[member], distinct[other])
+    return np.array([groups.find(i) for i in range(len(texts))], dtype=np.int64)
+
+
+def group_representatives(groups: np.ndarray):
+    """Split ``find_near_duplicates`` output for fanning results out.
+
+    Returns positions of the representatives and, for every text, the index
+    of its representative among them, so ``results[index]`` maps results
+    computed for representatives back to all texts.
+    """
+    positions, index = np.unique(groups, return_inverse=True)
+    return positions, index.ravel()
@@ -1,11 +1,16 @@
+from __future__ import annotations
+
 import argparse
+from typing import TYPE_CHECKING
 
 import numpy as np
-import torch
 import pandas as pd
-from sentence_transformers import SentenceTransformer
 
 from .keyword_search import TextPipeline
+from .dedup_reviews import find_near_duplicates, group_representatives
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
 
 __all__ = ["get_embeddings"]
 
@@ -17,12 +22,21 @@ def get_embeddings(
     text_pipeline: TextPipeline,
     show_progress_bar=True,
     batch_size=32,
+    dedup_threshold: float = None,
 ):
     reviews_text = reviews[review_col].apply(text_pipeline).to_list()
+    if dedup_threshold is None:
+        return model.encode(
+            reviews_text, batch_size=batch_size, show_progress_bar=show_progress_bar
+        )
+    groups = find_near_duplicates(reviews_text, threshold=dedup_threshold)
+    rep_positions, rep_index = group_representatives(groups)
     embs = model.encode(
-        reviews_text, batch_size=batch_size, show_progress_bar=show_progress_bar
+        [reviews_text[i] for i in rep_positions],
+        batch_size=batch_size,
+        show_progress_bar=show_progress_bar,
     )
-    return embs
+    return embs[rep_index]
 
 
 def removesuffix(input_str: str, suffix: str):
@@ -33,6 +47,9 @@ def removesuffix(input_str: str, suffix: str):
 
 
 def main():
+    import torch
+    from sentence_transformers import SentenceTransformer
+
     parser = argparse.ArgumentParser()
     parser.add_argument("input_filename")
     parser.add_argument("output_filename")
@@ -42,6 +59,7 @@ def main():
     parser.add_argument("-c", "--column_name", nargs="?", default="review_text")
     parser.add_argument("--show_progress", nargs="?", default=False, type=bool)
     parser.add_argument("--save_path", nargs="?", default=".")
+    parser.add_argument("--dedup_threshold", nargs="?", default=None, type=float)
     args = parser.parse_args()
 
     device = args.device
@@ -69,6 +87,7 @@ def main():
         text_pipeline,
         batch_size=batch_size,
         show_progress_bar=show_progress,
+        dedup_threshold=args.dedup_threshold,
     )
     np.save(output_filename, {"film_ids": film_ids, "embs_en": embs})
 
@@ -1,14 +1,16 @@
+from __future__ import annotations
+
 import argparse
-from typing import List
+from typing import TYPE_CHECKING, List
 from datetime import datetime
 
 import numpy as np
 import pandas as pd
-from bs4 import BeautifulSoup
 from tqdm import tqdm
-from selenium import webdriver
-from selenium.webdriver import ChromeOptions
-from selenium.webdriver.remote.webdriver import WebDriver
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+    from selenium.webdriver.remote.webdriver import WebDriver
 
 __all__ = ["get_reviews_from_content_list"]
 
@@ -101,6 +103,8 @@ def parse_reviews(soup: BeautifulSoup, content_id: int):
 
 
 def get_content_reviews_at_page(driver: WebDriver, content_id: int, page: int):
+    from bs4 import BeautifulSoup
+
     review_url = (
         "https://www.kinopoisk.ru/film/{}/reviews/ord"
         "/rating/status/all/perpage/200/page/{}/"
@@ -119,6 +123,8 @@ def get_checked_types(content_type: str):
 
 
 def get_pages_count_from_content(driver: WebDriver, content_id: int):
+    from bs4 import BeautifulSoup
+
     review_url = (
         "https://www.kinopoisk.ru/film/{}/reviews/ord"
         "/rating/status/all/perpage/200/page/{}/"
@@ -134,6 +140,8 @@ def get_pages_count_from_content(driver: WebDriver, content_id: int):
 
 
 def get_reviews_from_content(driver: WebDriver, content_id: int, show_progress=False):
+    from bs4 import BeautifulSoup
+
     try:
         pages_count = get_pages_count_from_content(driver, content_id)
     except Exception:
@@ -164,6 +172,9 @@ def get_reviews_from_content_list(
 
 
 def main():
+    from selenium import webdriver
+    from selenium.webdriver import ChromeOptions
+
     parser = argparse.ArgumentParser()
     parser.add_argument("input_filename", help="path to input .csv file")
     parser.add_argument("output_filename", help="path to output .csv file")
@@ -1,8 +1,6 @@
 import string
 from typing import List
 
-from nltk.stem.snowball import SnowballStemmer
-
 __all__ = ["TextPipeline"]
 
 
@@ -33,6 +31,8 @@ class Lowercase(Handler):
 
 class SnowballStemmerWrapper(Handler):
     def __init__(self):
+        from nltk.stem.snowball import SnowballStemmer
+
         super().__init__()
         self.stemmer = SnowballStemmer("russian")
 
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import os
+import argparse
+from typing import TYPE_CHECKING, Iterator, List
+
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+
+if TYPE_CHECKING:
+    from transformers import PreTrainedModel, PreTrainedTokenizerBase
+
+__all__ = ["predict_sentiment", "predict_sentiment_file"]
+
+# Same mapping as type2label used to fine-tune the model in the notebook
+LABELS = ["NEGATIVE", "POSITIVE"]
+BASE_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+
+
+def model_labels(model: PreTrainedModel) -> List[str]:
+    """Label names in the order of the model's classification head."""
+    config = model.config
+    labels = [config.id2label[i] for i in range(config.num_labels)]
+    if labels == [f"LABEL_{i}" for i in range(len(LABELS))]:
+        # Fine-tuned in the notebook without id2label, names are the defaults
+        return list(LABELS)
+    return labels
+
+
+def set_inference_threads(num_threads: int = None):
+    import torch
+
+    if num_threads is None:
+        num_threads = os.cpu_count() or 1
+    torch.set_num_threads(num_threads)
+    try:
+        # Independent ops are rare in DistilBERT, extra pools only add overhead
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Can only be set once, before any parallel work has started
+        pass
+
+
+def length_sorted_batches(lengths: List[int], batch_size: int):
+    order = np.argsort(lengths, kind="stable")
+    return [order[i : i + batch_size] for i in range(0, len(order), batch_size)]
+
+
+def predict_sentiment(
+    model: PreTrainedModel,
+    tokenizer: PreTrainedTokenizerBase,
+    texts: List[str],
+    batch_size=64,
+    max_length=64,
+    device="cpu",
+):
+    """Return probabilities of shape ``(len(texts), num_labels)``.
+
+    Texts are tokenized in one call without padding, grouped into batches
+    of similar length and padded only up to the longest text of a batch.
+    """
+    import torch
+
+    texts = list(texts)
+    if not texts:
+        return np.empty((0, model.config.num_labels), dtype=np.float32)
+    encoded = tokenizer(texts, truncation=True, max_length=max_length)
+    input_ids = encoded["input_ids"]
+    probas = np.empty((len(input_ids), model.config.num_labels), dtype=np.float32)
+    with torch.inference_mode():
+        for batch in length_sorted_batches([len(x) for x in input_ids], batch_size):
+            features = [{k: encoded[k][i] for k in encoded.keys()} for i in batch]
+            inputs = tokenizer.pad(features, return_tensors="pt")
+            inputs = {k: v.to(device) for k, v in inputs.items()}
+            logits = model(**inputs).logits
+            probas[batch] = torch.softmax(logits.float(), dim=-1).cpu().numpy()
+    return probas
+
+
+def read_reviews_chunks(input_filename: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    if input_filename.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(input_filename)
+        for batch in parquet_file.iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        with pd.read_csv(input_filename, chunksize=chunksize) as reader:
+            yield from reader
+
+
+class ReviewsWriter:
+    def __init__(self, output_filename: str):
+        self.output_filename = output_filename
+        self.parquet_writer = None
+        self.header = True
+
+    def write(self, df: pd.DataFrame):
+        if self.output_filename.endswith(".parquet"):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self.parquet_writer is None:
+                self.parquet_writer = pq.ParquetWriter(
+                    self.output_filename, table.schema
+                )
+            self.parquet_writer.write_table(table)
+        else:
+            mode = "w" if self.header else "a"
+            df.to_csv(self.output_filename, mode=mode, header=self.header, index=False)
+        self.header = False
+
+    def close(self):
+        if self.parquet_writer is not None:
+            self.parquet_writer.close()
+
+
+def predict_sentiment_file(
+    model: PreTrainedModel,
+    tokenizer: PreTrainedTokenizerBase,
+    input_filename: str,
+    output_filename: str,
+    column_name: str,
+    chunksize=10000,
+    batch_size=64,
+    max_length=64,
+    device="cpu",
+    show_progress_bar=True,
+):
+    labels = model_labels(model)
+    writer = ReviewsWriter(output_filename)
+    try:
+        chunks = read_reviews_chunks(input_filename, chunksize)
+        for df in tqdm(chunks, disable=not show_progress_bar, unit="chunk"):
+            df = df.dropna(subset=[column_name])
+            if df.empty:
+                continue
+            probas = predict_sentiment(
+                model,
+                tokenizer,
+                df[column_name].to_list(),
+                batch_size=batch_size,
+                max_length=max_length,
+                device=device,
+            )
+            df = df.assign(sentiment=[labels[i] for i in probas.argmax(axis=1)])
+            for i, label in enumerate(labels):
+                df[f"proba_{label.lower()}"] = probas[:, i]
+            writer.write(df)
+    finally:
+        writer.close()
+
+
+def main():
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("input_filename", help="path to .csv or .parquet file")
+    parser.add_argument("output_filename", help="path to .csv or .parquet file")
+    parser.add_argument("-m", "--model_path", required=True)
+    parser.add_argument("--tokenizer", nargs="?", default=BASE_MODEL)
+    parser.add_argument("-c", "--column_name", nargs="?", default="review_text")
+    parser.add_argument("-d", "--device", nargs="?", default="cpu")
+    parser.add_argument("-b", "--batch_size", nargs="?", default=64, type=int)
+    parser.add_argument("--max_length", nargs="?", default=64, type=int)
+    parser.add_argument("--chunksize", nargs="?", default=10000, type=int)
+    parser.add_argument("--num_threads", nargs="?", default=None, type=int)
+    parser.add_argument("--show_progress", action="store_true")
+    args = parser.parse_args()
+
+    device = args.device
+    if device == "cuda:0" and not torch.cuda.is_available():
+        print("Error: GPU is not available, fallback to CPU")
+        device = "cpu"
+    if device == "cpu":
+        set_inference_threads(args.num_threads)
+    tokenizer = AutoTokenizer.from_pretrained(args.tokenizer)
+    model = AutoModelForSequenceClassification.from_pretrained(args.model_path)
+    model.to(device)
+    model.eval()
+
+    predict_sentiment_file(
+        model,
+        tokenizer,
+        args.input_filename,
+        args.output_filename,
+        args.column_name,
+        chunksize=args.chunksize,
+        batch_size=args.batch_size,
+        max_length=args.max_length,
+        device=device,
+        show_progress_bar=args.show_progress,
+    )
+
+
+if __name__ == "__main__":
+    main()
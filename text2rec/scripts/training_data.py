@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import os
+import json
+import math
+import shutil
+import hashlib
+import argparse
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .predict_sentiment import BASE_MODEL, LABELS
+
+if TYPE_CHECKING:
+    from transformers import PreTrainedTokenizerBase
+
+__all__ = [
+    "TokenStore",
+    "DynamicPaddingCollator",
+    "LengthGroupedSampler",
+    "load_token_store",
+    "make_dataloader",
+]
+
+TYPE2LABEL = {label: i for i, label in enumerate(LABELS)}
+
+
+def file_hash(path: str, block_size=1 << 20):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def tokenizer_hash(tokenizer: PreTrainedTokenizerBase):
+    vocab = sorted(tokenizer.get_vocab().items())
+    payload = json.dumps(
+        [type(tokenizer).__name__, tokenizer.name_or_path, vocab], ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TokenStore:
+    """Memory-mapped pre-tokenized reviews.
+
+    Token ids of all reviews are concatenated in ``tokens.bin`` and
+    ``offsets.npy`` holds where each review starts, so review lengths are
+    available without touching the tokens. Items are unpadded.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.offsets = np.load(os.path.join(path, "offsets.npy"), mmap_mode="r")
+        self.lengths = np.diff(self.offsets)
+        tokens_path = os.path.join(path, "tokens.bin")
+        if os.path.getsize(tokens_path) > 0:
+            self.tokens = np.memmap(tokens_path, dtype=self.meta["dtype"], mode="r")
+        else:
+            # Empty files can't be memory-mapped
+            self.tokens = np.empty(0, dtype=self.meta["dtype"])
+        labels_path = os.path.join(path, "labels.npy")
+        self.labels = None
+        if os.path.exists(labels_path):
+            self.labels = np.load(labels_path, mmap_mode="r")
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def __getitem__(self, i: int):
+        item = {"input_ids": self.tokens[self.offsets[i] : self.offsets[i + 1]]}
+        if self.labels is not None:
+            item["labels"] = int(self.labels[i])
+        return item
+
+    @classmethod
+    def build(
+        cls,
+        path: str,
+        chunks: Iterator[pd.DataFrame],
+        tokenizer: PreTrainedTokenizerBase,
+        text_col: str,
+        label_col: Optional[str] = None,
+        label_map: Optional[Dict] = None,
+        max_length=64,
+        meta: Optional[Dict] = None,
+    ):
+        dtype = np.uint16 if len(tokenizer) <= np.iinfo(np.uint16).max else np.int32
+        # Build next to the final location and rename, so that an interrupted
+        # build never leaves a half-written cache behind
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        os.makedirs(tmp_path, exist_ok=True)
+        try:
+            offsets, labels = [0], [np.empty(0, dtype=np.int64)]
+            with open(os.path.join(tmp_path, "tokens.bin"), "wb") as tokens_file:
+                for df in chunks:
+                    df = df.dropna(subset=[text_col])
+                    if label_col is not None:
+                        if label_map is not None:
+                            df = df.assign(**{label_col: df[label_col].map(label_map)})
+                        df = df.dropna(subset=[label_col])
+                        labels.append(df[label_col].to_numpy(dtype=np.int64))
+                    if df.empty:
+                        # e.g. a chunk of only NEUTRAL reviews, tokenizers fail on []
+                        continue
+                    encoded = tokenizer(
+                        df[text_col].to_list(), truncation=True, max_length=max_length
+                    )
+                    input_ids = encoded["input_ids"]
+                    lengths = np.fromiter(map(len, input_ids), dtype=np.int64)
+                    offsets.extend((offsets[-1] + np.cumsum(lengths)).tolist())
+                    flat = np.fromiter(
+                        (t for ids in input_ids for t in ids),
+                        dtype=dtype,
+                        count=int(lengths.sum()),
+                    )
+                    tokens_file.write(flat.tobytes())
+            offsets = np.array(offsets, dtype=np.int64)
+            np.save(os.path.join(tmp_path, "offsets.npy"), offsets)
+            if label_col is not None:
+                np.save(os.path.join(tmp_path, "labels.npy"), np.concatenate(labels))
+            meta = dict(meta or {})
+            meta.update(
+                dtype=np.dtype(dtype).name,
+                max_length=max_length,
+                text_col=text_col,
+                label_col=label_col,
+                pad_token_id=tokenizer.pad_token_id,
+                size=len(offsets) - 1,
+            )
+            with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+                json.dump(meta, f, indent=2)
+        except BaseException:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+        try:
+            os.rename(tmp_path, path)
+        except OSError:
+            # Another process has built the same cache in the meantime
+            shutil.rmtree(tmp_path)
+        return cls(path)
+
+
+def load_token_store(
+    input_filename: str,
+    tokenizer: PreTrainedTokenizerBase,
+    text_col: str,
+    label_col: Optional[str] = None,
+    label_map: Optional[Dict] = None,
+    max_length=64,
+    cache_dir="data/cache/tokens",
+    chunksize=10000,
+):
+    """Return the token store for a file, tokenizing it only on a cache miss."""
+    settings = [text_col, label_col, sorted((label_map or {}).items()), max_length]
+    key = hashlib.sha256(
+        json.dumps(
+            [file_hash(input_filename), tokenizer_hash(tokenizer), settings],
+            default=str,
+        ).encode("utf-8")
+    ).hexdigest()[:32]
+    path = os.path.join(cache_dir, key)
+    if os.path.exists(os.path.join(path, "meta.json")):
+        return TokenStore(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    usecols = [text_col] + ([label_col] if label_col is not None else [])
+    with pd.read_csv(input_filename, usecols=usecols, chunksize=chunksize) as reader:
+        return TokenStore.build(
+            path,
+            reader,
+            tokenizer,
+            text_col,
+            label_col=label_col,
+            label_map=label_map,
+            max_length=max_length,
+            meta={"source": os.path.abspath(input_filename)},
+        )
+
+
+class DynamicPaddingCollator:
+    """Pads a batch only up to its longest item and builds the attention mask."""
+
+    def __init__(self, pad_token_id: int):
+        self.pad_token_id = pad_token_id
+
+    def __call__(self, items: List[Dict]):
+        import torch
+
+        max_len = max(len(item["input_ids"]) for item in items)
+        input_ids = np.full((len(items), max_len), self.pad_token_id, dtype=np.int64)
+        attention_mask = np.zeros((len(items), max_len), dtype=np.int64)
+        for i, item in enumerate(items):
+            length = len(item["input_ids"])
+            input_ids[i, :length] = item["input_ids"]
+            attention_mask[i, :length] = 1
+        batch = {
+            "input_ids": torch.from_numpy(input_ids),
+            "attention_mask": torch.from_numpy(attention_mask),
+        }
+        if "labels" in items[0]:
+            batch["labels"] = torch.tensor([item["labels"] for item in items])
+        return batch
+
+
+class LengthGroupedSampler:
+    """Batch sampler: shuffles indices, then sorts them by length inside
+    mega-batches and yields whole batches of indices.
+
+    Batches hold reviews of similar length, so little compute is wasted on
+    padding, while the order changes between epochs: every pass over the
+    sampler moves on to the next epoch, ``set_epoch`` sets it explicitly.
+    Pass it as ``DataLoader(batch_sampler=...)``, re-chunking the indices
+    would mix a short batch into every batch after it.
+    """
+
+    def __init__(
+        self,
+        lengths: np.ndarray,
+        batch_size: int,
+        shuffle=True,
+        seed=42,
+        mega_batch_mult=50,
+    ):
+        self.lengths = np.asarray(lengths)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.seed = seed
+        self.mega_batch_size = batch_size * mega_batch_mult
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int):
+        self.epoch = epoch
+
+    def __len__(self):
+        if not self.shuffle:
+            return math.ceil(len(self.lengths) / self.batch_size)
+        # The last mega-batch may be short and end with its own short batch
+        full, rest = divmod(len(self.lengths), self.mega_batch_size)
+        per_mega_batch = math.ceil(self.mega_batch_size / self.batch_size)
+        return full * per_mega_batch + math.ceil(rest / self.batch_size)
+
+    def __iter__(self):
+        if not self.shuffle:
+            indices = np.argsort(self.lengths, kind="stable")
+            return iter(
+                indices[i : i + self.batch_size].tolist()
+                for i in range(0, len(indices), self.batch_size)
+            )
+        rng = np.random.default_rng(self.seed + self.epoch)
+        self.epoch += 1
+        indices = rng.permutation(len(self.lengths))
+        mega_batches = [
+            indices[i : i + self.mega_batch_size]
+            for i in range(0, len(indices), self.mega_batch_size)
+        ]
+        mega_batches = [
+            mb[np.argsort(-self.lengths[mb], kind="stable")] for mb in mega_batches
+        ]
+        batches = [
+            mb[i : i + self.batch_size]
+            for mb in mega_batches
+            for i in range(0, len(mb), self.batch_size)
+        ]
+        # Shuffle batches too, otherwise every mega-batch starts with the longest
+        order = rng.permutation(len(batches))
+        return iter(batches[i].tolist() for i in order)
+
+
+def make_dataloader(store: TokenStore, batch_size=16, shuffle=True, seed=42, **kwargs):
+    from torch.utils.data import DataLoader
+
+    sampler = LengthGroupedSampler(
+        store.lengths, batch_size, shuffle=shuffle, seed=seed
+    )
+    collator = DynamicPaddingCollator(store.meta["pad_token_id"])
+    return DataLoader(store, batch_sampler=sampler, collate_fn=collator, **kwargs)
+
+
+def main():
+    from transformers import AutoTokenizer
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("input_filename", help="path to .csv file")
+    parser.add_argument("--tokenizer", nargs="?", default=BASE_MODEL)
+    parser.add_argument("-c", "--column_name", nargs="?", default="review_text")
+    parser.add_argument("-l", "--label_column_name", nargs="?", default="review_type")
+    parser.add_argument("--max_length", nargs="?", default=64, type=int)
+    parser.add_argument("--cache_dir", nargs="?", default="data/cache/tokens")
+    parser.add_argument("--chunksize", nargs="?", default=10000, type=int)
+    args = parser.parse_args()
+
+    tokenizer = AutoTokenizer.from_pretrained(args.tokenizer)
+    store = load_token_store(
+        args.input_filename,
+        tokenizer,
+        args.column_name,
+        label_col=args.label_column_name,
+        label_map=TYPE2LABEL,
+        max_length=args.max_length,
+        cache_dir=args.cache_dir,
+        chunksize=args.chunksize,
+    )
+    print(
+        f"Token store {store.path}: {len(store)} reviews, "
+        f"mean length {store.lengths.mean():.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,48 +1,151 @@
-import time
 import argparse
+import warnings
+import threading
+from typing import List, Optional
 
 import pandas as pd
 from tqdm import tqdm
-from googletrans import Translator
 
-__all__ = ["translate_reviews"]
+from .translation_engine import (
+    TranslationEngine,
+    TranslationBackend,
+    HttpTranslateBackend,
+    ThrottledError,
+)
+from .translation_memory import TranslationMemory, split_sentences_with_separators
+from .dedup_reviews import find_near_duplicates, group_representatives
 
+__all__ = ["translate_reviews", "GoogleTranslateBackend"]
 
-class Timer:
-    def __enter__(self):
-        self.start = time.perf_counter()
-        return self
 
-    def __exit__(self, typ, value, traceback):
-        self.elapsed = time.perf_counter() - self.start
+class GoogleTranslateBackend(TranslationBackend):
+    def __init__(self, service_urls=("translate.google.com", "translate.google.ru")):
+        super().__init__()
+        self.service_urls = list(service_urls)
+        self.local = threading.local()
+
+    def _translator(self):
+        translator = getattr(self.local, "translator", None)
+        if translator is None:
+            from googletrans import Translator
+
+            translator = Translator(
+                service_urls=self.service_urls, raise_exception=True
+            )
+            self.local.translator = translator
+        return translator
+
+    def translate(self, text: str, src: str, dest: str) -> str:
+        try:
+            return self._translator().translate(text, src=src, dest=dest).text
+        except Exception as e:
+            if "429" in str(e):
+                raise ThrottledError(str(e))
+            raise
+
+    def reset(self):
+        self.local.translator = None
+
+
+def translate_texts(
+    texts: List[Optional[str]],
+    engine: TranslationEngine,
+    max_request_chars=5000,
+    memory: TranslationMemory = None,
+    sentence_level=False,
+    show_progress_bar=True,
+) -> List[Optional[str]]:
+    """Translate texts, None marks texts that could not be translated."""
+    texts_units, texts_separators = [], []
+    for text in texts:
+        separators = []
+        if not isinstance(text, str):
+            units = []
+        elif sentence_level:
+            units, separators = split_sentences_with_separators(
+                text[:max_request_chars]
+            )
+        else:
+            units = [text[:max_request_chars]]
+        texts_units.append(units)
+        texts_separators.append(separators)
+    units = list(dict.fromkeys(u for t_units in texts_units for u in t_units))
+    known = memory.get_many(units) if memory is not None else {}
+    missing = [u for u in units if u not in known]
+    with tqdm(total=len(missing), disable=not show_progress_bar) as pbar:
+        new = dict(zip(missing, engine.translate(missing, progress=pbar.update)))
+    if memory is not None:
+        memory.put_many(new)
+    known.update(new)
+    translated = []
+    for text_units, separators in zip(texts_units, texts_separators):
+        units_en = [known[u] for u in text_units]
+        if not units_en or any(u is None for u in units_en):
+            translated.append(None)
+            continue
+        # Re-join with the original whitespace to keep paragraph breaks
+        parts = [units_en[0]]
+        for separator, unit_en in zip(separators, units_en[1:]):
+            parts += [separator, unit_en]
+        translated.append("".join(parts))
+    return translated
 
 
 def translate_reviews(
-    reviews: pd.DataFrame, column_name, delay=0.5, show_progress_bar=True
+    reviews: pd.DataFrame,
+    column_name,
+    delay: float = None,
+    show_progress_bar=True,
+    *,
+    backend: TranslationBackend = None,
+    max_workers=4,
+    rate=2.0,
+    max_request_chars=5000,
+    memory: TranslationMemory = None,
+    sentence_level=False,
+    dedup_threshold: float = None,
 ) -> pd.DataFrame:
-    translated_reviews = []
-    service_urls = ["translate.google.com", "translate.google.ru"]
-    translator = Translator(service_urls=service_urls, raise_exception=True)
+    if delay is not None:
+        warnings.warn(
+            "delay is deprecated, use rate=1/delay instead",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        rate = 1 / delay
+    if backend is None:
+        backend = GoogleTranslateBackend()
+    engine = TranslationEngine(
+        backend,
+        max_workers=max_workers,
+        rate=rate,
+        max_request_chars=max_request_chars,
+    )
+    texts = reviews[column_name].to_list()
+    rep_positions = rep_index = None
+    if dedup_threshold is not None:
+        groups = find_near_duplicates(
+            reviews[column_name].fillna("").to_list(), threshold=dedup_threshold
+        )
+        rep_positions, rep_index = group_representatives(groups)
+        texts = [texts[i] for i in rep_positions]
+    translated_texts = translate_texts(
+        texts,
+        engine,
+        max_request_chars=max_request_chars,
+        memory=memory,
+        sentence_level=sentence_level,
+        show_progress_bar=show_progress_bar,
+    )
+    if rep_index is not None:
+        translated_texts = [translated_texts[i] for i in rep_index]
     translated = reviews.copy(deep=True)
-    reviews_text = reviews[column_name]
-    for i, text_ru in enumerate(tqdm(reviews_text, disable=not show_progress_bar)):
-        text_en = None
-        with Timer() as timer:
-            try:
-                text_en = translator.translate(text_ru[:5000], src="ru", dest="en").text
-            except TypeError:
-                print(f"\rCant translate {i}-th review")
-                time.sleep(delay)
-            except Exception:
-                time.sleep(delay)  # 60 - works
-                translator = Translator(service_urls=service_urls, raise_exception=True)
-                text_en = translator.translate(text_ru[:5000], src="ru", dest="en").text
-            translated_reviews.append(text_en)
-        time.sleep(max(delay - timer.elapsed, 0))
-    if i + 1 != len(reviews_text):
-        translated = translated.iloc[:i].copy(deep=True)
-    translated[column_name] = translated_reviews
+    translated[column_name] = translated_texts
     translated = translated.dropna(subset=[column_name])
+    if len(translated) < len(reviews):
+        print(
+            f"Dropped {len(reviews) - len(translated)} of {len(reviews)} reviews "
+            f"that could not be translated ({engine.dropped} failed requests)"
+        )
     return translated
 
 
@@ -53,6 +156,14 @@ def main():
     parser.add_argument("-c", "--column_name", nargs="?", default="review_text")
     parser.add_argument("-s", "--start_index", nargs="?", default=0)
     parser.add_argument("-e", "--end_index", nargs="?", default=-1)
+    parser.add_argument("-w", "--max_workers", nargs="?", default=4, type=int)
+    parser.add_argument("-r", "--rate", nargs="?", default=2.0, type=float)
+    parser.add_argument("--max_request_chars", nargs="?", default=5000, type=int)
+    parser.add_argument("--service_url", nargs="?", default=None)
+    parser.add_argument("-m", "--memory_path", nargs="?", default=None)
+    parser.add_argument("--memory_max_entries", nargs="?", default=None, type=int)
+    parser.add_argument("--sentence_level", action="store_true")
+    parser.add_argument("--dedup_threshold", nargs="?", default=None, type=float)
     args = parser.parse_args()
 
     input_filename = args.input_filename
@@ -63,9 +174,28 @@ def main():
     end_index = int(args.end_index)
     end_index = len(df) if end_index == -1 else end_index
     reviews = df.iloc[start_index:end_index].copy(deep=True)
+    backend = None
+    if args.service_url is not None:
+        backend = HttpTranslateBackend(args.service_url)
+    memory = None
+    if args.memory_path is not None:
+        memory = TranslationMemory(args.memory_path, args.memory_max_entries)
 
     print(f"Starting translating reviews from {start_index} to {end_index}")
-    translated = translate_reviews(reviews, column_name)
+    translated = translate_reviews(
+        reviews,
+        column_name,
+        backend=backend,
+        max_workers=args.max_workers,
+        rate=args.rate,
+        max_request_chars=args.max_request_chars,
+        memory=memory,
+        sentence_level=args.sentence_level,
+        dedup_threshold=args.dedup_threshold,
+    )
+    if memory is not None:
+        print(f"Translation memory stats: {memory.stats()}")
+        memory.close()
     translated.to_csv(output_filename, index=False)
 
 
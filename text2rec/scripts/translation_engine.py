@@ -0,0 +1,222 @@
+import time
+import threading
+from typing import Callable, List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+__all__ = [
+    "TranslationEngine",
+    "TranslationBackend",
+    "HttpTranslateBackend",
+    "ThrottledError",
+]
+
+REQUEST_SEPARATOR = "\n\n§§\n\n"
+
+
+class ThrottledError(Exception):
+    pass
+
+
+class TranslationBackend:
+    def __init__(self):
+        pass
+
+    def translate(self, text: str, src: str, dest: str) -> str:
+        raise NotImplementedError
+
+    def reset(self):
+        pass
+
+
+class HttpTranslateBackend(TranslationBackend):
+    """Backend for a plain HTTP service, e.g. a local stand-in for tests.
+
+    The service receives ``{"q": text, "source": src, "target": dest}`` as
+    JSON and must answer ``{"translatedText": ...}``; status 429 means
+    the request was throttled.
+    """
+
+    def __init__(self, url: str, timeout=30):
+        super().__init__()
+        self.url = url
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def translate(self, text: str, src: str, dest: str) -> str:
+        session = getattr(self.local, "session", None)
+        if session is None:
+            import requests
+
+            session = self.local.session = requests.Session()
+        payload = {"q": text, "source": src, "target": dest}
+        r = session.post(self.url, json=payload, timeout=self.timeout)
+        if r.status_code == 429:
+            raise ThrottledError(f"Throttled by {self.url}")
+        r.raise_for_status()
+        return r.json()["translatedText"]
+
+    def reset(self):
+        self.local.session = None
+
+
+class TokenBucket:
+    """Thread-safe token bucket with AIMD rate adaptation.
+
+    Throttling responses cut the rate by ``decrease_factor``, at most once
+    per refill interval so that a burst of concurrent 429s counts as one
+    signal. Every successful request raises the rate by ``increase_step``
+    up to ``max_rate``.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        min_rate=0.1,
+        max_rate: Optional[float] = None,
+        increase_step=0.05,
+        decrease_factor=0.5,
+    ):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.min_rate = min_rate
+        self.max_rate = max_rate if max_rate is not None else rate * 4
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.last_decrease = float("-inf")
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def on_success(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttle(self):
+        with self.lock:
+            self._refill()
+            now = time.monotonic()
+            if now - self.last_decrease >= 1 / self.rate:
+                self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                self.last_decrease = now
+            # Drain the bucket so every worker backs off, not only this one
+            self.tokens = min(self.tokens, 0)
+
+
+def pack_texts(texts: List[str], max_chars: int, separator=REQUEST_SEPARATOR):
+    batches = []
+    batch, batch_len = [], 0
+    for i, text in enumerate(texts):
+        added_len = len(text) + (len(separator) if batch else 0)
+        if batch and batch_len + added_len > max_chars:
+            batches.append(batch)
+            batch, batch_len = [], 0
+            added_len = len(text)
+        batch.append(i)
+        batch_len += added_len
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class TranslationEngine:
+    def __init__(
+        self,
+        backend: TranslationBackend,
+        max_workers=4,
+        rate=2.0,
+        max_request_chars=5000,
+        max_retries=5,
+        max_throttled=100,
+        retry_delay=1.0,
+        src="ru",
+        dest="en",
+    ):
+        self.backend = backend
+        self.max_workers = max_workers
+        self.limiter = TokenBucket(rate)
+        self.max_request_chars = max_request_chars
+        self.max_retries = max_retries
+        self.max_throttled = max_throttled
+        self.retry_delay = retry_delay
+        self.dropped = 0
+        self.dropped_lock = threading.Lock()
+        self.src = src
+        self.dest = dest
+
+    def _request(self, text: str):
+        # Throttling is paced by the limiter, so it has its own, larger budget
+        failed, throttled = 0, 0
+        while failed < self.max_retries and throttled < self.max_throttled:
+            self.limiter.acquire()
+            try:
+                result = self.backend.translate(text, self.src, self.dest)
+            except ThrottledError:
+                self.limiter.on_throttle()
+                throttled += 1
+                continue
+            except TypeError:
+                # googletrans fails this way on texts it can't parse
+                break
+            except Exception as e:
+                print(f"Got exception in translation: {str(e)}")
+                time.sleep(self.retry_delay)
+                self.backend.reset()
+                failed += 1
+                continue
+            self.limiter.on_success()
+            return result
+        print(
+            f"Cant translate text after {failed} errors "
+            f"and {throttled} throttled requests"
+        )
+        return None
+
+    def _translate_batch(self, texts: List[str]):
+        if len(texts) == 1:
+            return [self._request(texts[0])]
+        joined = self._request(REQUEST_SEPARATOR.join(texts))
+        parts = None
+        if joined is not None:
+            parts = [p.strip() for p in joined.split(REQUEST_SEPARATOR.strip())]
+        if parts is None or len(parts) != len(texts):
+            # Separator was lost in translation, fall back to one per request
+            return [self._request(text) for text in texts]
+        return parts
+
+    def translate(self, texts: List[str], progress: Optional[Callable] = None):
+        texts = [text[: self.max_request_chars] for text in texts]
+        result: List[Optional[str]] = [None] * len(texts)
+        batches = pack_texts(texts, self.max_request_chars)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self._translate_batch, [texts[i] for i in batch]): batch
+                for batch in batches
+            }
+            for future in as_completed(futures):
+                batch = futures[future]
+                for i, text_en in zip(batch, future.result()):
+                    result[i] = text_en
+                    if text_en is None:
+                        with self.dropped_lock:
+                            self.dropped += 1
+                if progress is not None:
+                    progress(len(batch))
+        return result
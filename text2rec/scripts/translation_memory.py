@@ -0,0 +1,128 @@
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Tuple
+
+__all__ = ["TranslationMemory", "split_sentences"]
+
+SENTENCE_REGEX = re.compile(r"(?<=[…!\.\?])(\s+)")
+
+
+def normalize_text(text: str):
+    text = unicodedata.normalize("NFKC", text)
+    return " ".join(text.split())
+
+
+def text_key(text: str, src: str, dest: str):
+    normalized = normalize_text(text)
+    return hashlib.sha1(f"{src}:{dest}:{normalized}".encode("utf-8")).hexdigest()
+
+
+def split_sentences_with_separators(text: str) -> Tuple[List[str], List[str]]:
+    """Split into sentences and the whitespace between them.
+
+    ``separators[i]`` goes between ``sentences[i]`` and ``sentences[i + 1]``,
+    so paragraph breaks survive translating sentence by sentence.
+    """
+    parts = SENTENCE_REGEX.split(text.strip())
+    if parts == [""]:
+        return [], []
+    return parts[::2], parts[1::2]
+
+
+def split_sentences(text: str) -> List[str]:
+    return split_sentences_with_separators(text)[0]
+
+
+class TranslationMemory:
+    """Persistent sqlite cache of translations keyed by normalized text hash.
+
+    When ``max_entries`` is set, least recently used entries are evicted
+    on every write that overflows it.
+    """
+
+    def __init__(
+        self, path: str, max_entries: Optional[int] = None, src="ru", dest="en"
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.src = src
+        self.dest = dest
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS memory ("
+            "key TEXT PRIMARY KEY, translation TEXT NOT NULL, used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS memory_used ON memory(used)")
+        self.conn.commit()
+
+    def key(self, text: str):
+        return text_key(text, self.src, self.dest)
+
+    def get_many(self, texts: Iterable[str]) -> Dict[str, str]:
+        keys = {text: self.key(text) for text in texts}
+        found = {}
+        key_list = list(set(keys.values()))
+        with self.lock:
+            # Stay below SQLITE_MAX_VARIABLE_NUMBER on old sqlite builds
+            for i in range(0, len(key_list), 900):
+                chunk = key_list[i : i + 900]
+                placeholders = ",".join("?" * len(chunk))
+                query = (
+                    "SELECT key, translation FROM memory "
+                    f"WHERE key IN ({placeholders})"
+                )
+                rows = self.conn.execute(query, chunk).fetchall()
+                found.update(rows)
+            now = time.time()
+            self.conn.executemany(
+                "UPDATE memory SET used = ? WHERE key = ?",
+                [(now, key) for key in found],
+            )
+            self.conn.commit()
+            self.hits += len(found)
+            self.misses += len(key_list) - len(found)
+        return {text: found[key] for text, key in keys.items() if key in found}
+
+    def put_many(self, translations: Dict[str, str]):
+        now = time.time()
+        rows = [
+            (self.key(text), translation, now)
+            for text, translation in translations.items()
+            if translation is not None
+        ]
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO memory (key, translation, used) "
+                "VALUES (?, ?, ?)",
+                rows,
+            )
+            if self.max_entries is not None:
+                self.conn.execute(
+                    "DELETE FROM memory WHERE key IN (SELECT key FROM memory "
+                    "ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+            self.conn.commit()
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM memory").fetchone()[0]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self),
+        }
+
+    def close(self):
+        self.conn.close()